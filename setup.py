@@ -6,6 +6,7 @@ setup(
     packages=['tus'],
     install_requires=[
         'Click',
+        'ijson>=3.1',
     ],
     entry_points={
         'console_scripts': [
@@ -15,22 +15,78 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import glob
 import os
+import shutil
 import subprocess
-import shlex
 
 import click
 
 
+# PAR2 binary to use. Prefer par2cmdline-turbo, which ships SIMD (e.g. AVX2,
+# AVX-512, GFNI) accelerated kernels, if it is installed under its own name.
+PAR2_BIN = shutil.which('par2-turbo') or 'par2'
+
+# Minimal size of PAR2 blocks we choose explicitly (for smaller backups, par2's
+# default block size is used).
+MIN_BLOCK_SIZE = 4 * 1024 * 1024
+# Maximal number of PAR2 source blocks (the cost of Reed-Solomon computation
+# grows with the number of blocks).
+MAX_BLOCK_COUNT = 2000
+# Alignment of PAR2 block size.
+BLOCK_SIZE_ALIGNMENT = 4 * 1024
+
+
 def _get_names(backup_dir):
     """Get names of backup and recovery directories and backup name."""
-    # strip off the trailing / (if present)
-    backup_dir = backup_dir.rstrip(os.sep)
+    # make the path absolute since par2 is run in the recovery directory and
+    # normalize it (e.g. strip off the trailing /)
+    backup_dir = os.path.abspath(backup_dir)
     recovery_dir = os.path.join(backup_dir, 'recovery')
-    _, _, backup_name = backup_dir.rpartition(os.sep)
+    backup_name = os.path.basename(backup_dir)
     return backup_dir, recovery_dir, backup_name
 
 
+def _get_block_size(backup_files):
+    """Get PAR2 block size suitable for the given backup files.
+
+    Limit the number of blocks to ``MAX_BLOCK_COUNT`` for backups whose
+    blocks would be larger than ``MIN_BLOCK_SIZE``. Return ``None`` for
+    smaller backups so that par2's default (finer) block size is used.
+
+    """
+    total_size = sum(os.path.getsize(path) for path in backup_files)
+    block_size = -(-total_size // MAX_BLOCK_COUNT)
+    if block_size <= MIN_BLOCK_SIZE:
+        return None
+    # round up to a multiple of BLOCK_SIZE_ALIGNMENT
+    return -(-block_size // BLOCK_SIZE_ALIGNMENT) * BLOCK_SIZE_ALIGNMENT
+
+
+def _compute(backup_dir, threads):
+    """Compute PAR2 recovery files for the given backup directory.
+
+    Return par2's return code.
+
+    """
+    backup_dir, recovery_dir, backup_name = _get_names(backup_dir)
+    os.makedirs(recovery_dir, exist_ok=True)
+    # Pass the largest files first so that their (longest) processing starts
+    # earliest and the processing of smaller files overlaps with it.
+    backup_files = sorted(
+        (path for path in glob.glob(os.path.join(backup_dir, '*'))
+         if os.path.isfile(path)),
+        key=lambda path: (-os.path.getsize(path), path)
+    )
+    block_size = _get_block_size(backup_files)
+    block_size_args = [f'-s{block_size}'] if block_size else []
+    return subprocess.run(
+        [PAR2_BIN, 'create', f'-B{backup_dir}', *block_size_args, '-r5',
+         '-u', f'-t{threads}', backup_name, *backup_files],
+        cwd=recovery_dir
+    ).returncode
+
+
 @click.group()
 def cli():
     pass
@@ -42,15 +98,41 @@ def cli():
               show_default=True)
 @click.argument('backup-dir', type=click.Path(exists=True))
 def compute(threads, backup_dir):
-    """Compute PAR2 recovery files for the given backup directory."""
-    backup_dir, recovery_dir, backup_name = _get_names(backup_dir)
-    if not os.path.exists(recovery_dir):
-        os.makedirs(recovery_dir)
-    subprocess.run(
-        shlex.split(f'par2 create -B{backup_dir} -r5 -u -t{threads} '
-                    f'{backup_name} {backup_dir}/*'),
-        cwd=recovery_dir
-    )
+    """Compute PAR2 recovery files for the given backup directory.
+
+    Installing par2cmdline-turbo enables SIMD (e.g. GFNI, AVX-512)
+    accelerated computation of recovery files.
+
+    """
+    _compute(backup_dir, threads)
+
+
+@cli.command('compute-all')
+@click.option('--threads', '-t', type=int, default=os.cpu_count(),
+              help="Number of CPU threads to use for main processing.",
+              show_default=True)
+@click.argument('parent-dir',
+                type=click.Path(exists=True, file_okay=False,
+                                resolve_path=True))
+def compute_all(threads, parent_dir):
+    """Compute PAR2 recovery files for all backup directories.
+
+    Backup directories are all subdirectories of the given parent directory.
+
+    """
+    with os.scandir(parent_dir) as entries:
+        backup_dirs = sorted(entry.path for entry in entries
+                             if entry.is_dir())
+    failed_dirs = []
+    for backup_dir in backup_dirs:
+        click.echo(f"Computing PAR2 recovery files for '{backup_dir}'...")
+        if _compute(backup_dir, threads) != 0:
+            failed_dirs.append(backup_dir)
+    if failed_dirs:
+        raise click.ClickException(
+            "Computing PAR2 recovery files failed for the following backup "
+            "directories:\n" + "\n".join(failed_dirs)
+        )
 
 
 @cli.command()
@@ -64,6 +146,6 @@ def verify(backup_dir):
             "run 'tus-par2 compute' first!"
         )
     subprocess.run(
-        shlex.split(f'par2 verify -B{backup_dir} '
-                    f'{recovery_dir}/{backup_name}.par2'),
+        [PAR2_BIN, 'verify', f'-B{backup_dir}',
+         os.path.join(recovery_dir, f'{backup_name}.par2')],
     )
@@ -15,11 +15,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import fnmatch
+import concurrent.futures
+import fcntl
+import itertools
 import logging
+import multiprocessing
 import os
+import selectors
 import signal
 import shlex
+import shutil
+import string
 import subprocess
 import sys
 
@@ -28,12 +34,31 @@ import click
 
 logger = logging.getLogger(__name__)
 
+# Supported compressors and extensions of their compressed files.
+COMPRESSOR_EXTENSIONS = {
+    'pigz': 'gz',
+    'zstd': 'zst',
+}
+
+# Size of the tail of processes' stderr kept for error messages.
+STDERR_TAIL_SIZE = 64 * 1024
+
+# Size of pipes between the backup/restore pipeline's processes (the default
+# value of /proc/sys/fs/pipe-max-size).
+PIPE_SIZE = 1024 * 1024
+
+
+class _BraceMessage:
+    """Log message that is formatted with str.format() only when emitted."""
+
+    def __init__(self, fmt, args):
+        self.fmt = fmt
+        self.args = args
 
-class _BraceString(str):
-    def __mod__(self, other):
-        return self.format(*other)
     def __str__(self):
-        return self
+        if not self.args:
+            return self.fmt
+        return self.fmt.format(*self.args)
 
 
 class _StyleAdapter(logging.LoggerAdapter):
@@ -41,19 +66,28 @@ class _StyleAdapter(logging.LoggerAdapter):
     def __init__(self, logger, extra=None):
         super().__init__(logger, extra)
 
-    def process(self, msg, kwargs):
-        return _BraceString(msg), kwargs
+    def log(self, level, msg, *args, **kwargs):
+        if self.isEnabledFor(level):
+            msg, kwargs = self.process(msg, kwargs)
+            self.logger.log(level, _BraceMessage(msg, args), **kwargs)
 
 
-def _setup_logging(log_file=None):
+def _setup_logging(log_file=None, mode='w'):
     """Set up logging.
 
-    If ``log_file`` is given, configure logging to the given file.
+    If ``log_file`` is given, configure logging to the given file opened with
+    the given ``mode``.
+
+    Logging can be set up repeatedly, e.g. in worker processes which
+    inherited parent's logging configuration.
 
     """
     global logger
 
-    logger.setLevel(logging.DEBUG)
+    base_logger = logging.getLogger(__name__)
+    base_logger.setLevel(logging.DEBUG)
+    for handler in list(base_logger.handlers):
+        base_logger.removeHandler(handler)
 
     # Create a custom log messages formatter.
     formatter = logging.Formatter(
@@ -65,18 +99,234 @@ def _setup_logging(log_file=None):
     # Configure logging to a file if log file is given
     if log_file:
         # Define a Handler which writes DEBUG messages or higher to log_file.
-        log_file = logging.FileHandler(log_file, mode='w')
+        log_file = logging.FileHandler(log_file, mode=mode)
         log_file.setLevel(logging.DEBUG)
         # Tell the handler to use this format.
         log_file.setFormatter(formatter)
         # Add the handler to the root logger.
-        logger.addHandler(log_file)
+        base_logger.addHandler(log_file)
 
     # Use str.format() syntax for logging messages.
-    logger = _StyleAdapter(logger)
+    logger = _StyleAdapter(base_logger)
+
+
+def _popen(command, **kwargs):
+    """Execute the given command in a new process.
+
+    The command's executable is resolved to an absolute path and parent's
+    file descriptors are not closed explicitly (Python creates them as
+    non-inheritable anyway) so that :mod:`subprocess` can spawn the process
+    with the cheaper :func:`os.posix_spawn` instead of fork + exec.
+
+    """
+    executable = shutil.which(command[0])
+    if executable is None:
+        error_msg = f"Command '{command[0]}' is not installed!"
+        logger.error(error_msg)
+        raise click.ClickException(error_msg)
+    return subprocess.Popen(command, executable=executable, close_fds=False,
+                            **kwargs)
+
+
+def _set_pipe_size(pipe, size=PIPE_SIZE):
+    """Set the capacity of the given pipe to the given size.
+
+    Larger pipes reduce the number of context switches between the processes
+    at both ends of the pipe.
+
+    """
+    try:
+        fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, size)
+    except OSError as e:
+        logger.warning("Unable to set pipe size to {0} bytes: {1}", size, e)
+
+
+def _drop_page_cache(fd):
+    """Write out the given file's data and drop it from the page cache.
+
+    This prevents large streams passing through the page cache from evicting
+    more useful pages.
+
+    """
+    os.fdatasync(fd)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+class _StreamSplitter:
+    """Split a stream read from a pipe into parts of the given size.
+
+    Parts are named the same way as ``split --suffix-length=2`` names them,
+    i.e. ``<prefix>aa``, ``<prefix>ab``, ...
+
+    Data is moved with :func:`os.splice` so it is never copied to user space.
+
+    Finished parts are written out and dropped from the page cache in a
+    separate thread so that splicing doesn't wait for their writeback.
+
+    """
+
+    def __init__(self, prefix, part_size):
+        self.prefix = prefix
+        self.part_size = part_size
+        self._suffixes = (''.join(s) for s in
+                          itertools.product(string.ascii_lowercase, repeat=2))
+        self._part_path = None
+        self._part_fd = None
+        self._written = 0
+        self._releaser = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._releases = []
+
+    def _open_part(self):
+        suffix = next(self._suffixes, None)
+        if suffix is None:
+            raise click.ClickException(
+                f"Output file suffixes for '{self.prefix}' exhausted.\n"
+                "You should provide a larger archive size!"
+            )
+        self._part_path = self.prefix + suffix
+        self._part_fd = os.open(
+            self._part_path,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC,
+            0o644,
+        )
+        self._written = 0
+
+    @staticmethod
+    def _release_part(part_fd):
+        try:
+            _drop_page_cache(part_fd)
+        finally:
+            os.close(part_fd)
+
+    def _close_part(self):
+        part_fd, self._part_fd = self._part_fd, None
+        if self._written > 0:
+            self._releases.append(
+                self._releaser.submit(self._release_part, part_fd)
+            )
+        else:
+            os.close(part_fd)
+            # Don't leave an empty part behind (just like split).
+            os.remove(self._part_path)
+
+    def splice(self, source_fd):
+        """Splice the data available in the given pipe into backup parts.
+
+        Return the number of spliced bytes, which is 0 at the end of stream.
+
+        """
+        if self._part_fd is None:
+            self._open_part()
+        count = os.splice(source_fd, self._part_fd,
+                          self.part_size - self._written)
+        self._written += count
+        if self._written == self.part_size:
+            self._close_part()
+        return count
+
+    def close(self):
+        """Close the current part (if any) and wait for parts' writeback."""
+        try:
+            if self._part_fd is not None:
+                self._close_part()
+        finally:
+            self._releaser.shutdown()
+        for release in self._releases:
+            release.result()
+
+
+def _communicate(processes, output=None, splitter=None):
+    """Wait for the given processes to terminate and return their stderr.
+
+    Processes' stderr pipes are drained as data becomes available so that a
+    process never blocks on writing to a full stderr pipe. Drained data is
+    passed through to our stderr (e.g. to display Partclone's progress). If
+    ``output`` pipe is given, its data is spliced into backup parts with the
+    given ``splitter`` at the same time.
+
+    Return a dictionary mapping processes to the decoded last
+    ``STDERR_TAIL_SIZE`` bytes of their stderr.
+
+    """
+    stderrs = {}
+    with selectors.DefaultSelector() as selector:
+        for p in processes:
+            if p.stderr is not None:
+                os.set_blocking(p.stderr.fileno(), False)
+                selector.register(p.stderr, selectors.EVENT_READ, p)
+                stderrs[p] = bytearray()
+        if output is not None:
+            selector.register(output, selectors.EVENT_READ)
+        while selector.get_map():
+            for key, _ in selector.select():
+                if key.fileobj is output:
+                    if splitter.splice(output.fileno()) == 0:
+                        selector.unregister(output)
+                    continue
+                try:
+                    data = os.read(key.fd, PIPE_SIZE)
+                except BlockingIOError:
+                    continue
+                if data:
+                    sys.stderr.buffer.write(data)
+                    sys.stderr.buffer.flush()
+                    stderr = stderrs[key.data]
+                    stderr += data
+                    del stderr[:-STDERR_TAIL_SIZE]
+                else:
+                    selector.unregister(key.fileobj)
+    for p in processes:
+        p.wait()
+    return {p: stderrs[p].decode('utf-8', errors='replace') if p in stderrs
+            else None for p in processes}
+
+
+def _feed_files(paths, pipe):
+    """Feed the contents of the given files to the given pipe and close it.
+
+    Data is moved with :func:`os.splice` so it is never copied to user space.
+
+    """
+    try:
+        for path in paths:
+            with open(path, 'rb') as f:
+                while os.splice(f.fileno(), pipe.fileno(), PIPE_SIZE):
+                    pass
+    except BrokenPipeError:
+        # The reading process exited early, its return code will tell why.
+        pass
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
+            pass
+
+
+def _split_cpus(count):
+    """Split available CPUs into at most ``count`` sets of adjacent CPUs."""
+    cpus = sorted(os.sched_getaffinity(0))
+    count = min(count, len(cpus))
+    return [set(cpus[i * len(cpus) // count:(i + 1) * len(cpus) // count])
+            for i in range(count)]
+
+
+def _init_backup_worker(log_file, cpu_sets, worker_counter):
+    """Initialize a backup worker process.
+
+    Set up logging to the given log file and restrict the worker (and
+    processes it spawns) to its own set of CPUs from the given CPU sets.
+
+    """
+    _setup_logging(log_file, mode='a')
+    with worker_counter.get_lock():
+        worker_id = worker_counter.value
+        worker_counter.value += 1
+    if len(cpu_sets) > 1:
+        os.sched_setaffinity(0, cpu_sets[worker_id % len(cpu_sets)])
 
 
-def _backup_partition(source_device, backup_dir, archive_size):
+def _backup_partition(source_device, backup_dir, archive_size, threads,
+                      compressor, pigz_blocksize, rsyncable):
     """Backup the given partition using Partclone."""
     logger.info("Backing up {0}...", source_device)
     # TODO: Guess the filesystem of the source device.
@@ -94,77 +344,83 @@ def _backup_partition(source_device, backup_dir, archive_size):
     partclone_command = [
         f'partclone.{fs_type}',
         '--logfile', f'{backup_dir}/partclone-{source_device_name}.log',
-        '--buffer_size', '10485670',
+        '--buffer_size', str(16 * 1024 * 1024),
         '--clone',
         '--source', source_device,
         '--output', '-',
     ]
-    pigz_command = [
-        'pigz',
-        '--stdout',
-        '--fast',
-        '--blocksize', '1024',
-        '--rsyncable',
-    ]
-    split_command = [
-        'split',
-        '--suffix-length=2',
-        '--bytes', f'{archive_size}MB',
-        '-', f'{backup_dir}/{source_device_name}.{fs_type}-ptcl-img.gz.',
-    ]
+    if compressor == 'zstd':
+        compressor_command = [
+            'zstd',
+            '--stdout',
+            '--fast=3',
+            '--long=27',
+            f'-T{threads}',
+        ]
+    else:
+        compressor_command = [
+            'pigz',
+            '--stdout',
+            '--fast',
+            '--blocksize', str(pigz_blocksize),
+            '--processes', str(threads),
+        ]
+    if rsyncable:
+        compressor_command.append('--rsyncable')
+    output_prefix = (
+        f'{backup_dir}/{source_device_name}.{fs_type}-ptcl-img.'
+        f'{COMPRESSOR_EXTENSIONS[compressor]}.'
+    )
 
     logger.info("Running backup command as a series of the following piped "
                 "commands:")
 
     logger.info("- {0}", partclone_command)
-    # TODO: Capture Partclone's stderr and display it asynchrously at the same
-    # time.
-    process_partclone = subprocess.Popen(
+    process_partclone = _popen(
         partclone_command,
         stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
+    _set_pipe_size(process_partclone.stdout)
 
-    logger.info("- {0}", pigz_command)
-    process_pigz = subprocess.Popen(
-        pigz_command,
+    logger.info("- {0}", compressor_command)
+    process_compressor = _popen(
+        compressor_command,
         stdin=process_partclone.stdout,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
+    _set_pipe_size(process_compressor.stdout)
+    processes = [process_partclone, process_compressor]
 
-    logger.info("- {0}", split_command)
-    process_split = subprocess.Popen(
-        split_command,
-        stdin=process_pigz.stdout,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    logger.info("- split into {0} MiB parts named {1}aa, {1}ab, ...",
+                archive_size, output_prefix)
 
+    splitter = _StreamSplitter(output_prefix, archive_size * 1024 * 1024)
     try:
-        # Allow Partclone process to receive a SIGPIPE if pigz exits before
-        # Partclone.
+        # Allow Partclone process to receive a SIGPIPE if the compressor exits
+        # before Partclone.
         process_partclone.stdout.close()
-        # Allow pigz process to receive a SIGPIPE if split exits before pigz.
-        process_pigz.stdout.close()
-        # Interact with the split process (send data to stdin, read data from
-        # stdout/stderr, wait for process to terminate).
-        split_stdout, split_stderr = process_split.communicate()
+        # Split compressor's output directly into backup parts while draining
+        # processes' stderr.
+        try:
+            stderrs = _communicate(processes, process_compressor.stdout,
+                                   splitter)
+        finally:
+            splitter.close()
+            # Allow compressor process to receive a SIGPIPE if we stopped
+            # reading its output.
+            process_compressor.stdout.close()
     except:
-        for p in [process_partclone, process_pigz, process_split]:
+        for p in processes:
             p.kill()
             p.wait()
         raise
-    for p in [process_partclone, process_pigz, process_split]:
-        # Wait for the process to finish.
-        retcode = p.poll()
+    for p in processes:
+        # Get process' return code.
+        retcode = p.returncode
         # Get process' stderr.
-        stderr = None
-        if p == process_split:
-            # The split process' stderr was already read when
-            # process_split.communicate() was called.
-            stderr = split_stderr.decode('utf-8')
-        elif p.stderr is not None:
-            stderr = p.stderr.read().decode('utf-8')
+        stderr = stderrs[p]
 
         if retcode and retcode != 0:
             exception_msg = (
@@ -176,8 +432,6 @@ def _backup_partition(source_device, backup_dir, archive_size):
             raise click.ClickException(exception_msg)
         # TODO: Handle Partclone's lack of proper setting of return code to
         # non-zero on some errors and manually detect unsuccessful runs.
-        # However, we need to be able to asynchronously capture Partclone's
-        # stderr first.
         # if p == process_partclone:
         #     if 'unset_name' in stderr:
         #         raise click.ClickException(
@@ -186,6 +440,18 @@ def _backup_partition(source_device, backup_dir, archive_size):
         #             f"Command's stderr:\n{stderr}"
         #     )
 
+    # Drop the source device's data read by Partclone from the page cache.
+    # This is only a hint, so failing to give it must not fail the backup.
+    try:
+        source_fd = os.open(source_device, os.O_RDONLY)
+        try:
+            os.posix_fadvise(source_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(source_fd)
+    except OSError as e:
+        logger.warning("Unable to drop {0} from the page cache: {1}",
+                       source_device, e)
+
     logger.info("Successfully finished backing up {0}...", source_device)
 
 
@@ -200,18 +466,36 @@ def cli():
               required=True,
               help="Directory where to store the backup.")
 @click.option('--archive-size', '-s', type=int, default=4096,
-              help="Size (in MiBs) of the gzipped partition backup parts.",
+              help="Size (in MiBs) of the compressed partition backup parts.",
+              show_default=True)
+@click.option('--threads', '-p', type=int, default=os.cpu_count(),
+              help="Number of threads the compressor should use (split "
+                   "among concurrently backed up partitions).",
+              show_default=True)
+@click.option('--compressor', type=click.Choice(COMPRESSOR_EXTENSIONS),
+              default='pigz',
+              help="Compressor to use for compressing partition backups.",
+              show_default=True)
+@click.option('--pigz-blocksize', type=int, default=4096,
+              help="Size (in KiBs) of the blocks pigz compresses in parallel "
+                   "(only used with pigz).",
+              show_default=True)
+@click.option('--rsyncable/--no-rsyncable', default=True,
+              help="Make the compressed backup rsync-friendly at the cost of "
+                   "lower parallel compression efficiency.",
               show_default=True)
 @click.argument('source-devices', type=click.Path(exists=True), nargs=-1)
-def backup(backup_dir, archive_size, source_devices):
+def backup(backup_dir, archive_size, threads, compressor, pigz_blocksize,
+           rsyncable, source_devices):
     """Backup the given partition(s) using Partclone."""
-    command_name = '{} backup'.format(os.path.basename(sys.argv[0]))
+    script_name = os.path.basename(sys.argv[0])
+    command_name = '{} backup'.format(script_name)
 
     # Check if running as root.
     # TODO: Convert this to a decorator.
     if not os.geteuid() == 0:
         raise click.ClickException(
-            "The {} script should be run as root!".format(sys.argv[0])
+            "The {} script should be run as root!".format(script_name)
         )
 
     # TODO: Check if all commands are installed.
@@ -227,11 +511,33 @@ def backup(backup_dir, archive_size, source_devices):
 
     log_file = os.path.join(backup_dir,
                             command_name.replace(' ', '-') + '.log')
-    _setup_logging(log_file)
+    # Open the log file in append mode so that the worker processes can write
+    # to it concurrently (the file is new since the backup directory is new).
+    _setup_logging(log_file, mode='a')
     logger.info("Starting {0}...", command_name)
 
-    for source_device in source_devices:
-        _backup_partition(source_device, backup_dir, archive_size)
+    # Back up each partition in a separate worker process so that backups
+    # of partitions on different disks can proceed concurrently.
+    max_workers = max(1, min(len(source_devices), os.cpu_count()))
+    # Give each worker its own share of CPUs (and compression threads) so
+    # concurrent compressors don't compete for the same cores.
+    cpu_sets = _split_cpus(max_workers)
+    worker_threads = max(1, threads // len(cpu_sets))
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers,
+            initializer=_init_backup_worker,
+            initargs=(log_file, cpu_sets, multiprocessing.Value('i', 0)),
+    ) as executor:
+        list(executor.map(
+            _backup_partition,
+            source_devices,
+            itertools.repeat(backup_dir),
+            itertools.repeat(archive_size),
+            itertools.repeat(worker_threads),
+            itertools.repeat(compressor),
+            itertools.repeat(pigz_blocksize),
+            itertools.repeat(rsyncable),
+        ))
 
     logger.info("Successfully finished running {0} command.", command_name)
 
@@ -239,9 +545,12 @@ def backup(backup_dir, archive_size, source_devices):
 @cli.command()
 @click.option('--log-file', '-l', type=click.Path(exists=False),
               help="Path to log file.")
+@click.option('--threads', '-p', type=int, default=os.cpu_count(),
+              help="Number of threads the decompressor should use.",
+              show_default=True)
 @click.argument('backup-file', type=click.Path(exists=True))
 @click.argument('destination-device', type=click.Path(exists=False))
-def restore(log_file, backup_file, destination_device):
+def restore(log_file, threads, backup_file, destination_device):
     """Restore the given Partclone backup to the given partition."""
     command_name = '{} restore'.format(os.path.basename(sys.argv[0]))
 
@@ -260,10 +569,12 @@ def restore(log_file, backup_file, destination_device):
     # Get all backup files.
     backup_dir = os.path.dirname(backup_file)
     backup_name, _ = os.path.splitext(os.path.basename(backup_file))
-    backup_files = sorted(
-        [os.path.join(backup_dir, bf) for bf in os.listdir(backup_dir)
-         if fnmatch.fnmatch(bf, backup_name + '.*')]
-    )
+    prefix = backup_name + '.'
+    with os.scandir(backup_dir or os.curdir) as entries:
+        backup_files = sorted(
+            entry.path for entry in entries
+            if entry.name.startswith(prefix) and entry.is_file()
+        )
     logger.info("Discovered the following backup files:")
     for backup_file in backup_files:
         logger.info("- {0}", backup_file)
@@ -286,15 +597,22 @@ def restore(log_file, backup_file, destination_device):
         abort=True,
     )
 
-    cat_command = [
-        'cat',
-        *backup_files,
-    ]
-    gzip_command = [
-        'gzip',
-        '--decompress',
-        '--to-stdout',
-    ]
+    _, extension = os.path.splitext(backup_name)
+    if extension == '.' + COMPRESSOR_EXTENSIONS['zstd']:
+        decompressor_command = [
+            'zstd',
+            '--decompress',
+            '--stdout',
+            '--long=27',
+            f'-T{threads}',
+        ]
+    else:
+        decompressor_command = [
+            'pigz',
+            '--decompress',
+            '--stdout',
+            '--processes', str(threads),
+        ]
     partclone_command = [
         f'partclone.{fs_type}',
         '--restore',
@@ -307,54 +625,50 @@ def restore(log_file, backup_file, destination_device):
 
     processes = []
 
-    logger.info("- {0}", cat_command)
-    process_cat = subprocess.Popen(
-        cat_command,
+    logger.info("- splice {0}", backup_files)
+    logger.info("- {0}", decompressor_command)
+    process_decompressor = _popen(
+        decompressor_command,
+        stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
     )
-    processes.append(process_cat)
-
-    logger.info("- {0}", gzip_command)
-    process_gzip = subprocess.Popen(
-        gzip_command,
-        stdin=process_cat.stdout,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    processes.append(process_gzip)
+    processes.append(process_decompressor)
+    _set_pipe_size(process_decompressor.stdin)
+    _set_pipe_size(process_decompressor.stdout)
 
     logger.info("- {0}", partclone_command)
-    # TODO: Capture Partclone's stderr and display it asynchrously at the same
-    # time.
-    process_partclone = subprocess.Popen(
+    process_partclone = _popen(
         partclone_command,
-        stdin=process_gzip.stdout,
-        stdout=subprocess.PIPE,
+        stdin=process_decompressor.stdout,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
     )
     processes.append(process_partclone)
 
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
     try:
-        # Allow cat process to receive a SIGPIPE if gzip exits before cat.
-        process_cat.stdout.close()
-        # Allow gzip process to receive a SIGPIPE if Partclone exits before
-        # gzip.
-        process_gzip.stdout.close()
-        # Interact with the Partclone process (send data to stdin, read data
-        # from stdout/stderr, wait for process to terminate).
-        partclone_stdout, _ = process_partclone.communicate()
+        # Allow decompressor process to receive a SIGPIPE if Partclone exits
+        # before the decompressor.
+        process_decompressor.stdout.close()
+        # Feed backup files to the decompressor in a separate thread.
+        feeder = executor.submit(_feed_files, backup_files,
+                                 process_decompressor.stdin)
+        # Wait for processes to terminate while draining their stderr.
+        stderrs = _communicate(processes)
+        feeder.result()
     except:
         for p in processes:
             p.kill()
             p.wait()
         raise
+    finally:
+        executor.shutdown()
     for p in processes:
-        # Wait for the process to finish.
-        retcode = p.poll()
+        # Get process' return code.
+        retcode = p.returncode
         # Get process' stderr.
-        stderr = None
-        if p.stderr is not None:
-            stderr = p.stderr.read().decode('utf-8')
+        stderr = stderrs[p]
 
         if retcode and retcode != 0:
             if retcode < 0:
@@ -379,8 +693,6 @@ def restore(log_file, backup_file, destination_device):
                 raise click.ClickException(exception_msg)
         # TODO: Handle Partclone's lack of proper setting of return code to
         # non-zero on some errors and manually detect unsuccessful runs.
-        # However, we need to be able to asynchronously capture Partclone's
-        # stderr first.
         # if p == process_partclone:
         #     if 'unset_name' in stderr:
         #         raise click.ClickException(
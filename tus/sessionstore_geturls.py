@@ -18,51 +18,72 @@
 # NOTE: The Firefox sessionstore format is loosely documented at:
 # https://wiki.mozilla.org/Firefox/session_restore#The_structure_of_sessionstore.js
 
-import json
+import sys
 
 import click
+import ijson
 
 
 INDENT = "    "
 
 
-def _print_entry(entry, indents):
-    print(INDENT * indents + entry.get('title', "(no title)"))
+def _print_entry(buf, entry, indents):
+    buf.append(f"{INDENT * indents}{entry.get('title', '(no title)')}\n")
     if 'url' not in entry:
         raise ValueError("Every Tab entry in a Session store file must have "
                          "an 'url' entry.")
     else:
-        print(INDENT * (indents + 1) + entry['url'])
+        buf.append(f"{INDENT * (indents + 1)}{entry['url']}\n")
 
 
-def _print_tab(tab, indents, text="Tab:"):
-    print(INDENT * indents + text)
+def _print_tab(buf, tab, indents, text="Tab:"):
+    buf.append(f"{INDENT * indents}{text}\n")
     entries = tab['entries']
     if not entries:
         raise ValueError("Every Tab in a Session store file must contain at "
                          "least one entry.")
-    _print_entry(entries[0], indents + 1)
+    _print_entry(buf, entries[0], indents + 1)
     if len(entries) > 1:
-        print(INDENT * (indents + 1) + "History:")
+        buf.append(f"{INDENT * (indents + 1)}History:\n")
         for entry in entries[1:]:
-            _print_entry(entry, indents + 2)
+            _print_entry(buf, entry, indents + 2)
+
+
+def _check_windows(events):
+    """Pass through the given parser events and check for session's windows."""
+    has_windows = False
+    for prefix, event, value in events:
+        if prefix == 'windows' and event == 'start_array':
+            has_windows = True
+        yield prefix, event, value
+    if not has_windows:
+        raise ValueError("The provided Firefox Sessionstore file is not a "
+                         "valid Sessionstore file (it has no 'windows' "
+                         "entry)")
 
 @click.command()
 @click.argument('session-file', type=click.Path(exists=True))
 def main(session_file):
     """Print URLs contained in the given Firefox sessionstore file."""
-    with open(session_file) as sf:
+    # Collect all output and write it at once instead of line by line.
+    out = []
+    with open(session_file, 'rb') as sf:
         try:
-            session = json.load(sf)
-        except JSONDecodeError as json_decode_error:
+            # Stream windows one at a time instead of loading the whole
+            # session into memory.
+            events = _check_windows(ijson.parse(sf, use_float=True))
+            windows = ijson.items(events, 'windows.item')
+            for i, window in enumerate(windows):
+                out.append("Window {}:\n".format(i + 1))
+                if len(window['tabs']) > 0:
+                    for j, tab in enumerate(window['tabs']):
+                        _print_tab(out, tab, 1, text="Tab {}:".format(j + 1))
+                    # TODO: Do we want to provide the ability to print URLs of
+                    # closed tabs as an option?
+                    # for j, tab in enumerate(window['closedTabs']):
+                    #     _print_tab(out, tab, 1,
+                    #                text="Closed tab {}:".format(j + 1))
+        except ijson.JSONError as json_decode_error:
             raise ValueError("The provided Firefox Sessionstore file is not a "
                              "valid JSON file") from json_decode_error
-    for i, window in enumerate(session['windows']):
-        print("Window {}:".format(i + 1))
-        if len(window['tabs']) > 0:
-            for j, tab in enumerate(window['tabs']):
-                _print_tab(tab, 1, text="Tab {}:".format(j + 1))
-            # TODO: Do we want to provide the ability to print URLs of closed
-            # tabs as an option?
-            # for j, tab in enumerate(window['closedTabs']):
-            #     _print_tab(tab, 1, text="Closed tab {}:".format(j + 1))
+    sys.stdout.write(''.join(out))